@@ -1,10 +1,33 @@
 """Portfolio rebalancing calculator algorithm."""
 
 from dataclasses import dataclass
-from decimal import Decimal, ROUND_HALF_UP
+from decimal import Context, Decimal, ROUND_FLOOR, ROUND_HALF_UP, localcontext
+from functools import lru_cache
 
+# Arithmetic context for the rebalance hot path: 18 significant digits
+# comfortably cover cent-exact portfolio math (the default is 28, and Decimal
+# op cost scales with precision), and half-up rounding matches the quantize
+# calls so they don't need to repeat it.
+_CALC_CONTEXT = Context(prec=18, rounding=ROUND_HALF_UP)
 
-@dataclass
+# Shared Decimal constants so hot paths don't re-parse literals per call
+_ZERO = Decimal("0")
+_CENT = Decimal("0.01")
+_HALF_CENT = Decimal("0.005")
+_HUNDRED = Decimal(100)
+
+
+def _to_cents(value: Decimal) -> int:
+    """Convert a Decimal dollar amount to integer cents (half-up)."""
+    return int((value * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def _from_cents(cents: int) -> Decimal:
+    """Convert integer cents back to a two-place Decimal."""
+    return Decimal(cents).scaleb(-2)
+
+
+@dataclass(slots=True)
 class AssetAllocation:
     """Represents an asset with its allocation data."""
     name: str
@@ -13,10 +36,22 @@ class AssetAllocation:
     allow_sell: bool = False
     
     # Calculated fields
-    current_pct: Decimal = Decimal("0")
-    buy_sell: Decimal = Decimal("0")
-    final_value: Decimal = Decimal("0")
-    final_pct: Decimal = Decimal("0")
+    current_pct: Decimal = _ZERO
+    buy_sell: Decimal = _ZERO
+    final_value: Decimal = _ZERO
+    final_pct: Decimal = _ZERO
+
+
+def _totals(
+    target_pcts: list[Decimal] | tuple[Decimal, ...],
+    current_values: list[Decimal] | tuple[Decimal, ...],
+) -> tuple[Decimal, Decimal]:
+    """
+    Shared prologue of both proportional-target entry points: the summed
+    target weight and portfolio value, seeded with _ZERO so the reductions
+    stay in Decimal throughout.
+    """
+    return sum(target_pcts, _ZERO), sum(current_values, _ZERO)
 
 
 def calculate_rebalance(
@@ -35,28 +70,49 @@ def calculate_rebalance(
     """
     if not assets:
         return assets
-    
+
+    with localcontext(_CALC_CONTEXT):
+        return _rebalance_in_context(assets, contribution)
+
+
+def _rebalance_in_context(
+    assets: list[AssetAllocation],
+    contribution: Decimal,
+) -> list[AssetAllocation]:
+    """Body of calculate_rebalance; expects _CALC_CONTEXT to be active."""
+    # Unpack the per-asset inputs into parallel lists once (SoA-style); the
+    # passes below index the lists instead of re-reading dataclass fields
+    target_pcts = [a.target_pct for a in assets]
+    current_values = [a.current_value for a in assets]
+    # Lowest allowed buy_sell per asset: no-sell assets can't go below zero,
+    # sellable assets can't sell more than they hold. Built here with the
+    # other parallel lists so the constraint solver works purely on SoA input.
+    clamp_floors = [
+        -value if a.allow_sell else _ZERO
+        for a, value in zip(assets, current_values)
+    ]
+
     # Calculate totals
-    total_current = sum(a.current_value for a in assets)
-    total_target_pct = sum(a.target_pct for a in assets)
+    total_target_pct, total_current = _totals(target_pcts, current_values)
     
     # Handle edge case of no target allocation
     if total_target_pct == 0:
         for asset in assets:
-            asset.current_pct = Decimal("0")
-            asset.buy_sell = Decimal("0")
+            asset.current_pct = _ZERO
+            asset.buy_sell = _ZERO
             asset.final_value = asset.current_value
-            asset.final_pct = Decimal("0")
+            asset.final_pct = _ZERO
         return assets
     
     # Calculate current percentages
-    for asset in assets:
-        if total_current > 0:
-            asset.current_pct = (asset.current_value / total_current * 100).quantize(
-                Decimal("0.01"), rounding=ROUND_HALF_UP
+    if total_current > 0:
+        for asset, current_value in zip(assets, current_values):
+            asset.current_pct = (current_value / total_current * _HUNDRED).quantize(
+                _CENT
             )
-        else:
-            asset.current_pct = Decimal("0")
+    else:
+        for asset in assets:
+            asset.current_pct = _ZERO
     
     # Calculate target final portfolio value
     total_final = total_current + contribution
@@ -65,141 +121,194 @@ def calculate_rebalance(
         # Withdrawing more than portfolio value - just distribute the withdrawal
         for asset in assets:
             asset.buy_sell = -asset.current_value
-            asset.final_value = Decimal("0")
-            asset.final_pct = Decimal("0")
+            asset.final_value = _ZERO
+            asset.final_pct = _ZERO
         return assets
     
-    # Calculate ideal buy/sell amounts (unconstrained)
-    ideal_buy_sell = []
-    for asset in assets:
-        target_value = (asset.target_pct / total_target_pct) * total_final
-        ideal = target_value - asset.current_value
-        ideal_buy_sell.append(ideal)
-    
+    # Calculate ideal buy/sell amounts (unconstrained).
+    # Hoist the per-asset division out of the loop: target_value is
+    # target_pct * (total_final / total_target_pct), so the scale factor is
+    # computed once and each asset costs a single multiply and subtract.
+    scale = total_final / total_target_pct
+    ideal_buy_sell = [
+        target_pct * scale - current_value
+        for target_pct, current_value in zip(target_pcts, current_values)
+    ]
+
+    # Fast path for the common UI case: no contribution and the portfolio
+    # already sits on target, i.e. every ideal move rounds to zero cents.
+    # Skips the constraint solver and the cents bookkeeping entirely; the
+    # full path would produce the same zero buy_sells and unchanged values.
+    if contribution == 0 and all(
+        -_HALF_CENT < delta < _HALF_CENT for delta in ideal_buy_sell
+    ):
+        for asset in assets:
+            asset.buy_sell = _ZERO
+            asset.final_value = asset.current_value
+            asset.final_pct = asset.current_pct
+        return assets
+
     # Apply constraints and redistribute
-    buy_sell_amounts = _apply_constraints(assets, ideal_buy_sell, contribution)
+    buy_sell_amounts = _apply_constraints(
+        target_pcts, clamp_floors, total_target_pct, ideal_buy_sell
+    )
     
-    # Apply calculated amounts and compute final values
-    total_buy_sell = Decimal("0")
-    for i, asset in enumerate(assets):
-        asset.buy_sell = buy_sell_amounts[i].quantize(
-            Decimal("0.01"), rounding=ROUND_HALF_UP
-        )
-        asset.final_value = asset.current_value + asset.buy_sell
-        total_buy_sell += asset.buy_sell
-    
-    # Distribute rounding difference to largest position
-    rounding_diff = contribution - total_buy_sell
-    if rounding_diff != 0 and assets:
-        # Find the asset with the largest absolute buy_sell that can absorb the difference
+    # Round the solved amounts to whole cents with largest-remainder
+    # allocation: floor each amount, then hand the leftover cents (one each)
+    # to the largest fractional remainders. One pass plus one sort, and the
+    # cent total provably equals the rounded contribution — no post-hoc
+    # correction needed. The bookkeeping runs in integer cents, which are
+    # exact and far cheaper than Decimal.
+    contribution_cents = _to_cents(contribution)
+
+    # The allocation below forces sum(buy_sell) to equal the cent-rounded
+    # contribution, so the post-rebalance total is known before the loop
+    # runs and final_pct doesn't need a separate re-sum pass.
+    total_final_actual = total_current + _from_cents(contribution_cents)
+    has_final_total = total_final_actual > 0
+
+    n = len(assets)
+    cents = [0] * n
+    remainders = [_ZERO] * n
+    floor_total = 0
+    for i, amount in enumerate(buy_sell_amounts):
+        scaled = amount * _HUNDRED
+        floor_cents = int(scaled.to_integral_value(rounding=ROUND_FLOOR))
+        cents[i] = floor_cents
+        remainders[i] = scaled - floor_cents
+        floor_total += floor_cents
+
+    leftover = contribution_cents - floor_total
+    if 0 <= leftover <= n:
+        if leftover:
+            order = sorted(range(n), key=remainders.__getitem__, reverse=True)
+            for i in order[:leftover]:
+                cents[i] += 1
+    else:
+        # The constraint solver stopped short of the target total (e.g.
+        # every asset clamped), so one-cent bumps can't close the gap.
+        # Fall back to half-up rounding with the residual absorbed by the
+        # largest position, preserving the exact-total invariant.
+        total_cents = 0
         max_idx = 0
-        max_abs = abs(assets[0].buy_sell)
-        for i, asset in enumerate(assets):
-            if abs(asset.buy_sell) > max_abs:
-                max_abs = abs(asset.buy_sell)
+        max_abs = -1
+        for i, amount in enumerate(buy_sell_amounts):
+            half_up = _to_cents(amount)
+            cents[i] = half_up
+            total_cents += half_up
+            if abs(half_up) > max_abs:
+                max_abs = abs(half_up)
                 max_idx = i
-        assets[max_idx].buy_sell += rounding_diff
-        assets[max_idx].final_value += rounding_diff
-    
-    # Calculate final percentages
-    total_final_actual = sum(a.final_value for a in assets)
-    for asset in assets:
-        if total_final_actual > 0:
-            asset.final_pct = (asset.final_value / total_final_actual * 100).quantize(
-                Decimal("0.01"), rounding=ROUND_HALF_UP
+        cents[max_idx] += contribution_cents - total_cents
+
+    for asset, asset_cents in zip(assets, cents):
+        asset.buy_sell = _from_cents(asset_cents)
+        asset.final_value = asset.current_value + asset.buy_sell
+        if has_final_total:
+            asset.final_pct = (asset.final_value / total_final_actual * _HUNDRED).quantize(
+                _CENT
             )
         else:
-            asset.final_pct = Decimal("0")
-    
+            asset.final_pct = _ZERO
+
     return assets
 
 
 def _apply_constraints(
-    assets: list[AssetAllocation],
+    target_pcts: list[Decimal],
+    clamp_floors: list[Decimal],
+    total_weight: Decimal,
     ideal_buy_sell: list[Decimal],
-    contribution: Decimal,
 ) -> list[Decimal]:
     """
     Apply constraints (no-sell, can't sell more than owned) and redistribute.
-    
-    Uses weighted redistribution to handle constrained assets.
+
+    Uses weighted redistribution to handle constrained assets. Operates on
+    the parallel lists the caller already built (target weights, per-asset
+    floors, summed weight) rather than re-unpacking the dataclasses.
     """
     result = list(ideal_buy_sell)
-    total_target_pct = sum(a.target_pct for a in assets)
-    
+    n = len(result)
+
     # Iteratively apply constraints and redistribute
-    max_iterations = len(assets) * 2  # Prevent infinite loops
+    max_iterations = n * 2  # Prevent infinite loops
     for _ in range(max_iterations):
-        constrained_indices = set()
-        excess = Decimal("0")
-        
-        for i, asset in enumerate(assets):
-            # Can't sell if not allowed
-            if not asset.allow_sell and result[i] < 0:
-                excess += result[i]  # This is negative
-                result[i] = Decimal("0")
-                constrained_indices.add(i)
-            
-            # Can't sell more than current value
-            elif result[i] < -asset.current_value:
-                excess += result[i] + asset.current_value
-                result[i] = -asset.current_value
-                constrained_indices.add(i)
-        
+        constrained = [False] * n
+        constrained_weight = _ZERO
+        excess = _ZERO
+
+        for i in range(n):
+            ideal = result[i]
+            clamped = max(ideal, clamp_floors[i])
+            if clamped != ideal:
+                excess += ideal - clamped  # This is negative
+                result[i] = clamped
+                constrained[i] = True
+                constrained_weight += target_pcts[i]
+
         if excess == 0:
             break
-        
+
         # Redistribute excess to unconstrained assets by weight
-        unconstrained_weight = sum(
-            assets[i].target_pct for i in range(len(assets))
-            if i not in constrained_indices
-        )
-        
+        unconstrained_weight = total_weight - constrained_weight
+
         if unconstrained_weight == 0:
             # All assets are constrained, can't redistribute
             break
-        
-        for i in range(len(assets)):
-            if i not in constrained_indices:
-                weight = assets[i].target_pct / unconstrained_weight
-                result[i] += excess * weight
-    
+
+        for i in range(n):
+            if not constrained[i]:
+                result[i] += excess * (target_pcts[i] / unconstrained_weight)
+
     return result
 
 
-def calculate_auto_contribution(assets: list[AssetAllocation]) -> Decimal:
+@lru_cache(maxsize=1024)
+def _auto_contribution_cached(key: tuple[tuple[Decimal, Decimal], ...]) -> Decimal:
     """
-    Calculate the minimum contribution needed to perfectly balance the portfolio.
-    
-    This finds the contribution amount where no selling is required
-    (all buy_sell amounts are >= 0).
+    Compute the auto-contribution from a hashable (target_pct, current_value)
+    snapshot. Memoized so repeated what-if calls over an unchanged portfolio
+    are cache hits.
     """
-    if not assets:
-        return Decimal("0")
-    
-    total_current = sum(a.current_value for a in assets)
-    total_target_pct = sum(a.target_pct for a in assets)
-    
+    target_pcts, current_values = zip(*key)
+    total_target_pct, total_current = _totals(target_pcts, current_values)
+
     if total_target_pct == 0:
-        return Decimal("0")
-    
+        return _ZERO
+
     # For each asset, calculate the contribution that would make its buy_sell = 0
     # target_value = (target_pct / total_target_pct) * (total_current + contribution)
     # current_value = target_value  (for buy_sell = 0)
     # current_value = (target_pct / total_target_pct) * (total_current + contribution)
     # current_value * total_target_pct / target_pct = total_current + contribution
     # contribution = current_value * total_target_pct / target_pct - total_current
-    
+
     min_contributions = []
-    for asset in assets:
-        if asset.target_pct > 0:
-            required_total = asset.current_value * total_target_pct / asset.target_pct
+    for target_pct, current_value in key:
+        if target_pct > 0:
+            required_total = current_value * total_target_pct / target_pct
             required_contribution = required_total - total_current
             min_contributions.append(required_contribution)
-    
+
     if not min_contributions:
-        return Decimal("0")
-    
+        return _ZERO
+
     # The minimum contribution is the maximum of all required contributions
     # (to ensure no asset needs to be sold)
-    return max(min_contributions).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    return max(min_contributions).quantize(_CENT, rounding=ROUND_HALF_UP)
+
+
+def calculate_auto_contribution(assets: list[AssetAllocation]) -> Decimal:
+    """
+    Calculate the minimum contribution needed to perfectly balance the portfolio.
+
+    This finds the contribution amount where no selling is required
+    (all buy_sell amounts are >= 0). Only target_pct and current_value affect
+    the result, so those fields form the memoization key.
+    """
+    if not assets:
+        return _ZERO
+
+    return _auto_contribution_cached(
+        tuple((a.target_pct, a.current_value) for a in assets)
+    )
@@ -1,10 +1,11 @@
 """Fidelity CSV parser for portfolio import."""
 
 import csv
-import re
+from collections import defaultdict
+from functools import lru_cache
 from io import StringIO
 from pathlib import Path
-from typing import Any
+from typing import Any, TextIO
 
 import yaml
 
@@ -13,21 +14,36 @@ MAPPING_FILE = Path(__file__).parent / "etf_mapping.yaml"
 # Required columns for Fidelity CSV
 REQUIRED_COLUMNS = {"Account Name", "Symbol", "Current Value"}
 
+# Deletes the $ sign and thousands separators from currency strings
+_CURRENCY_TRANSLATE = str.maketrans("", "", "$,")
+
 
 class CSVParseError(Exception):
     """Human-readable CSV parsing error."""
     pass
 
 
+@lru_cache(maxsize=1)
 def load_etf_mapping() -> dict[str, Any]:
-    """Load ETF mapping configuration from YAML file."""
+    """
+    Load ETF mapping configuration from YAML file.
+
+    The file is static at runtime, so the parsed result is cached after the
+    first call rather than re-read on every CSV upload.
+    """
     if not MAPPING_FILE.exists():
         return {"mappings": {}, "ignore": []}
-    
+
     with open(MAPPING_FILE, "r") as f:
         return yaml.safe_load(f) or {"mappings": {}, "ignore": []}
 
 
+@lru_cache(maxsize=1)
+def _ignore_set() -> frozenset[str]:
+    """Ignored symbols/descriptions as a frozenset for O(1) membership tests."""
+    return frozenset(load_etf_mapping().get("ignore", []))
+
+
 def parse_currency(value: str) -> float | None:
     """Parse currency string like '$281,678.11' or '($78,731.32)' to float."""
     if not value or value == "--":
@@ -35,14 +51,16 @@ def parse_currency(value: str) -> float | None:
     
     # Remove whitespace
     value = value.strip()
-    
+    if not value:
+        return None
+
     # Check for negative (parentheses)
-    is_negative = value.startswith("(") and value.endswith(")")
+    is_negative = value[0] == "(" and value[-1] == ")"
     if is_negative:
         value = value[1:-1]
-    
-    # Remove $ and commas
-    value = value.replace("$", "").replace(",", "")
+
+    # Remove $ and commas in a single pass
+    value = value.translate(_CURRENCY_TRANSLATE)
     
     try:
         result = float(value)
@@ -51,50 +69,44 @@ def parse_currency(value: str) -> float | None:
         return None
 
 
-def parse_fidelity_csv(csv_content: str) -> dict[str, Any]:
+def _iter_positions(csv_content: str | TextIO):
     """
-    Parse Fidelity CSV export and return structured data.
-    
-    Returns:
-        {
-            "accounts": ["Account Name 1", "Account Name 2"],
-            "positions": [
-                {
-                    "account": "Account Name",
-                    "symbol": "VTI",
-                    "description": "VANGUARD TOTAL STK MKT ETF",
-                    "current_value": 281678.11,
-                    "mapped_asset": "Domestic Equity" | None
-                }
-            ],
-            "mapping": {"VTI": "Domestic Equity", ...}
-        }
-    
+    Validate the CSV headers and yield position dicts one row at a time.
+
+    Streaming core shared by parse_fidelity_csv and
+    parse_and_aggregate_fidelity_csv, so consumers that only need an
+    aggregate never materialize the full positions list. Accepts either a
+    string or a text stream (e.g. a TextIOWrapper over the raw upload
+    bytes), so callers don't have to decode into an intermediate copy.
+
     Raises:
-        CSVParseError: If the CSV is malformed or missing required columns
+        CSVParseError: If the CSV is malformed, missing required columns,
+            or contains no data rows at all
     """
-    # Check for empty content
-    if not csv_content or not csv_content.strip():
-        raise CSVParseError("The file appears to be empty. Please upload a valid Fidelity CSV export.")
-    
+    if isinstance(csv_content, str):
+        # Check for empty content
+        if not csv_content.strip():
+            raise CSVParseError("The file appears to be empty. Please upload a valid Fidelity CSV export.")
+        csv_content = StringIO(csv_content)
+
     config = load_etf_mapping()
     mappings = config.get("mappings", {})
-    ignore_list = config.get("ignore", [])
+    ignore_set = _ignore_set()
     
     # Parse CSV
     try:
-        reader = csv.DictReader(StringIO(csv_content))
-        # Force reading fieldnames to detect CSV issues early
-        fieldnames = reader.fieldnames
+        reader = csv.reader(csv_content)
+        # Read the header row up front to detect CSV issues early
+        fieldnames = next(reader, None)
     except csv.Error as e:
         raise CSVParseError(f"Invalid CSV format: {str(e)}. Please ensure you're uploading a valid CSV file.")
-    
+
     # Check for required columns
     if fieldnames is None:
         raise CSVParseError(
             "Could not read CSV headers. The file may be empty or not a valid CSV format."
         )
-    
+
     missing_columns = REQUIRED_COLUMNS - set(fieldnames)
     if missing_columns:
         raise CSVParseError(
@@ -102,39 +114,48 @@ def parse_fidelity_csv(csv_content: str) -> dict[str, Any]:
             "This doesn't appear to be a Fidelity portfolio export. "
             "Please export from Fidelity: Positions → Download."
         )
-    
-    accounts = set()
-    positions = []
+
+    # Resolve column positions once so the row loop indexes lists directly
+    # instead of going through a per-row dict (as csv.DictReader would).
+    acct_i = fieldnames.index("Account Name")
+    sym_i = fieldnames.index("Symbol")
+    val_i = fieldnames.index("Current Value")
+    desc_i = fieldnames.index("Description") if "Description" in fieldnames else -1
+
     row_count = 0
-    
+
     for row in reader:
+        # Skip blank lines (DictReader did this implicitly)
+        if not row:
+            continue
         row_count += 1
-        # Get account name (handle None values)
-        account_name = (row.get("Account Name") or "").strip()
+        n_cols = len(row)
+        # Get account name (short rows are padded with empty fields)
+        account_name = row[acct_i].strip() if acct_i < n_cols else ""
         if not account_name:
             continue
-        
-        # Get symbol (handle None values)
-        symbol = (row.get("Symbol") or "").strip()
-        
+
+        # Get symbol
+        symbol = row[sym_i].strip() if sym_i < n_cols else ""
+
         # Skip if no symbol or in ignore list
         if not symbol:
             continue
-        
+
         # Clean symbol (remove ** suffix for money market)
-        clean_symbol = re.sub(r"\*+$", "", symbol)
-        
+        clean_symbol = symbol.rstrip("*")
+
         # Skip ignored symbols
-        if clean_symbol in ignore_list or symbol in ignore_list:
+        if clean_symbol in ignore_set or symbol in ignore_set:
             continue
-        
-        # Get description (handle None values)
-        description = (row.get("Description") or "").strip()
-        if description in ignore_list:
+
+        # Get description
+        description = row[desc_i].strip() if 0 <= desc_i < n_cols else ""
+        if description in ignore_set:
             continue
-        
-        # Get current value (handle None values)
-        current_value = parse_currency(row.get("Current Value") or "")
+
+        # Get current value
+        current_value = parse_currency(row[val_i] if val_i < n_cols else "")
         
         # Skip if no value or negative (pending activity)
         if current_value is None or current_value < 0:
@@ -142,37 +163,106 @@ def parse_fidelity_csv(csv_content: str) -> dict[str, Any]:
         
         # Map to asset type
         mapped_asset = mappings.get(clean_symbol)
-        
-        accounts.add(account_name)
-        positions.append({
+
+        yield {
             "account": account_name,
             "symbol": clean_symbol,
             "description": description,
             "current_value": current_value,
             "mapped_asset": mapped_asset,
-        })
-    
-    # Check if we found any valid positions
+        }
+
     if row_count == 0:
         raise CSVParseError(
             "No data rows found in the CSV file. "
             "Please ensure the file contains portfolio positions."
         )
-    
+
+
+def parse_fidelity_csv(csv_content: str | TextIO) -> dict[str, Any]:
+    """
+    Parse Fidelity CSV export and return structured data.
+
+    Returns:
+        {
+            "accounts": ["Account Name 1", "Account Name 2"],
+            "positions": [
+                {
+                    "account": "Account Name",
+                    "symbol": "VTI",
+                    "description": "VANGUARD TOTAL STK MKT ETF",
+                    "current_value": 281678.11,
+                    "mapped_asset": "Domestic Equity" | None
+                }
+            ],
+            "mapping": {"VTI": "Domestic Equity", ...}
+        }
+
+    Raises:
+        CSVParseError: If the CSV is malformed or missing required columns
+    """
+    accounts = set()
+    positions = []
+
+    for pos in _iter_positions(csv_content):
+        accounts.add(pos["account"])
+        positions.append(pos)
+
+    # Check if we found any valid positions
     if not positions:
         raise CSVParseError(
             "No valid positions found in the CSV. "
             "All rows were either empty, had no value, or were filtered out (cash/money market). "
             "Please check that your Fidelity export contains investment positions."
         )
-    
+
     return {
         "accounts": sorted(list(accounts)),
         "positions": positions,
-        "mapping": mappings,
+        "mapping": load_etf_mapping().get("mappings", {}),
     }
 
 
+def parse_and_aggregate_fidelity_csv(
+    csv_content: str | TextIO,
+    custom_mappings: dict[str, str] | None = None,
+) -> list[dict]:
+    """
+    Parse a Fidelity CSV and aggregate by asset type in a single pass.
+
+    Fast path for callers that only need the aggregated result: positions
+    stream straight into the accumulator and are never collected in a list.
+
+    Returns:
+        List of aggregated assets, same shape as aggregate_by_asset_type
+
+    Raises:
+        CSVParseError: If the CSV is malformed or contains no valid positions
+    """
+    custom_mappings = custom_mappings or {}
+
+    aggregated: dict[str, float] = {}
+    found_positions = False
+
+    for pos in _iter_positions(csv_content):
+        found_positions = True
+        asset_type = custom_mappings.get(pos["symbol"]) or pos["mapped_asset"]
+        if asset_type:
+            aggregated[asset_type] = aggregated.get(asset_type, 0) + pos["current_value"]
+
+    if not found_positions:
+        raise CSVParseError(
+            "No valid positions found in the CSV. "
+            "All rows were either empty, had no value, or were filtered out (cash/money market). "
+            "Please check that your Fidelity export contains investment positions."
+        )
+
+    return [
+        {"name": asset_type, "current_value": round(value, 2)}
+        for asset_type, value in sorted(aggregated.items())
+    ]
+
+
 def filter_positions_by_account(
     positions: list[dict], 
     account_name: str
@@ -195,17 +285,18 @@ def aggregate_by_asset_type(
     Returns:
         List of aggregated assets: [{"name": "Domestic Equity", "current_value": 123.45}, ...]
     """
-    custom_mappings = custom_mappings or {}
-    
-    aggregated: dict[str, float] = {}
-    
+    # Hoist the mapping lookup out of the loop; defaultdict drops the
+    # per-position .get(..., 0) fallback on the accumulator.
+    custom_get = (custom_mappings or {}).get
+    aggregated: defaultdict[str, float] = defaultdict(float)
+
     for pos in positions:
         # Use custom mapping if provided, otherwise use pre-mapped
-        asset_type = custom_mappings.get(pos["symbol"]) or pos.get("mapped_asset")
-        
+        asset_type = custom_get(pos["symbol"]) or pos.get("mapped_asset")
+
         if asset_type:
-            aggregated[asset_type] = aggregated.get(asset_type, 0) + pos["current_value"]
-    
+            aggregated[asset_type] += pos["current_value"]
+
     return [
         {"name": asset_type, "current_value": round(value, 2)}
         for asset_type, value in sorted(aggregated.items())
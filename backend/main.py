@@ -1,16 +1,23 @@
 """FastAPI backend for Portfolio Rebalancing Calculator."""
 
+import asyncio
+import io
 from decimal import Decimal
+from typing import Any, Callable
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 from calculator import AssetAllocation, calculate_rebalance, calculate_auto_contribution
 from presets import PRESETS, get_preset
 from storage import save_portfolio, load_portfolio, list_portfolios, delete_portfolio
-from csv_parser import parse_fidelity_csv, load_etf_mapping, filter_positions_by_account, aggregate_by_asset_type, CSVParseError
+from csv_parser import parse_fidelity_csv, parse_and_aggregate_fidelity_csv, load_etf_mapping, filter_positions_by_account, aggregate_by_asset_type, CSVParseError
 
-app = FastAPI(title="Portfolio Rebalancing Calculator API")
+app = FastAPI(
+    title="Portfolio Rebalancing Calculator API",
+    default_response_class=ORJSONResponse,
+)
 
 # CORS for frontend
 app.add_middleware(
@@ -77,6 +84,20 @@ class PortfolioData(BaseModel):
     contribution: float = 0.0
 
 
+def _warmup() -> None:
+    """Exercise the calculator once at import so the first real request
+    doesn't pay any lazy-initialization cost."""
+    dummy = [
+        AssetAllocation(name="a", target_pct=Decimal("60"), current_value=Decimal("60")),
+        AssetAllocation(name="b", target_pct=Decimal("40"), current_value=Decimal("40")),
+    ]
+    calculate_rebalance(dummy, Decimal("0"))
+    calculate_auto_contribution(dummy)
+
+
+_warmup()
+
+
 # API Endpoints
 
 @app.get("/api/presets", response_model=list[Preset])
@@ -108,25 +129,37 @@ def calculate(request: CalculateRequest):
     ]
     
     results = calculate_rebalance(allocations, Decimal(str(request.contribution)))
-    
-    total_current = sum(float(r.current_value) for r in results)
-    total_final = sum(float(r.final_value) for r in results)
-    total_target_pct = sum(float(r.target_pct) for r in results)
-    
-    return CalculateResponse(
-        assets=[
-            AssetResult(
+
+    # Build the response and accumulate the three totals in a single pass,
+    # converting each Decimal to float exactly once.
+    assets = []
+    total_current = 0.0
+    total_final = 0.0
+    total_target_pct = 0.0
+    for r in results:
+        current_value = float(r.current_value)
+        final_value = float(r.final_value)
+        target_pct = float(r.target_pct)
+        total_current += current_value
+        total_final += final_value
+        total_target_pct += target_pct
+        assets.append(
+            AssetResult.model_construct(
                 name=r.name,
-                target_pct=float(r.target_pct),
-                current_value=float(r.current_value),
+                target_pct=target_pct,
+                current_value=current_value,
                 current_pct=float(r.current_pct),
                 allow_sell=r.allow_sell,
                 buy_sell=float(r.buy_sell),
-                final_value=float(r.final_value),
+                final_value=final_value,
                 final_pct=float(r.final_pct),
             )
-            for r in results
-        ],
+        )
+
+    # These responses are built from values we computed ourselves, so skip
+    # Pydantic's per-field validation with model_construct.
+    return CalculateResponse.model_construct(
+        assets=assets,
         total_current=total_current,
         total_final=total_final,
         total_target_pct=total_target_pct,
@@ -212,47 +245,73 @@ class AggregatedAsset(BaseModel):
     current_value: float
 
 
-@app.post("/api/import/fidelity", response_model=ParsedCSVResponse)
-async def import_fidelity_csv(file: UploadFile = File(...)):
-    """Parse uploaded Fidelity CSV and return structured data."""
+async def _read_csv_upload(file: UploadFile) -> bytes:
+    """Validate an uploaded CSV file and return its raw bytes."""
     if not file.filename or not file.filename.endswith(".csv"):
         raise HTTPException(
-            status_code=400, 
+            status_code=400,
             detail="Please upload a CSV file. The file must have a .csv extension."
         )
-    
+
     content = await file.read()
-    
+
     # Check file size (reject if too small - likely empty)
     if len(content) < 10:
         raise HTTPException(
             status_code=400,
             detail="The uploaded file appears to be empty or too small."
         )
-    
+
+    return content
+
+
+def _parse_csv_bytes(content: bytes, parser: Callable[[Any], Any]) -> Any:
+    """
+    Run a CSV parser over the raw upload bytes.
+
+    The parser consumes a TextIOWrapper that decodes incrementally, so the
+    upload is never copied into an intermediate decoded string. Falls back
+    to latin-1 (which accepts any byte sequence) if the content isn't
+    valid UTF-8, matching the previous whole-buffer decode behavior.
+    """
     try:
-        csv_text = content.decode("utf-8")
+        return parser(io.TextIOWrapper(io.BytesIO(content), encoding="utf-8", newline=""))
     except UnicodeDecodeError:
-        try:
-            csv_text = content.decode("latin-1")
-        except UnicodeDecodeError:
-            raise HTTPException(
-                status_code=400,
-                detail="Could not read the file. Please ensure it's a valid text/CSV file."
-            )
-    
+        return parser(io.TextIOWrapper(io.BytesIO(content), encoding="latin-1", newline=""))
+
+
+@app.post("/api/import/fidelity", response_model=ParsedCSVResponse)
+async def import_fidelity_csv(file: UploadFile = File(...)):
+    """Parse uploaded Fidelity CSV and return structured data."""
+    content = await _read_csv_upload(file)
+
     try:
-        result = parse_fidelity_csv(csv_text)
+        # Parse on a worker thread so a large upload doesn't block the
+        # event loop for concurrent requests
+        result = await asyncio.to_thread(_parse_csv_bytes, content, parse_fidelity_csv)
     except CSVParseError as e:
         raise HTTPException(status_code=400, detail=str(e))
-    
-    return ParsedCSVResponse(
+
+    return ParsedCSVResponse.model_construct(
         accounts=result["accounts"],
-        positions=[Position(**p) for p in result["positions"]],
+        positions=[Position.model_construct(**p) for p in result["positions"]],
         mapping=result["mapping"],
     )
 
 
+@app.post("/api/import/fidelity-aggregate", response_model=list[AggregatedAsset])
+async def import_fidelity_csv_aggregate(file: UploadFile = File(...)):
+    """Parse uploaded Fidelity CSV and aggregate by asset type in one pass."""
+    content = await _read_csv_upload(file)
+
+    try:
+        result = await asyncio.to_thread(_parse_csv_bytes, content, parse_and_aggregate_fidelity_csv)
+    except CSVParseError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return [AggregatedAsset.model_construct(**a) for a in result]
+
+
 @app.get("/api/import/mapping")
 def get_etf_mapping_endpoint():
     """Get current ETF mapping configuration."""
@@ -268,4 +327,4 @@ def aggregate_positions(request: AggregateRequest):
     """Aggregate positions by asset type with optional custom mappings."""
     positions = [p.model_dump() for p in request.positions]
     result = aggregate_by_asset_type(positions, request.custom_mappings)
-    return [AggregatedAsset(**a) for a in result]
+    return [AggregatedAsset.model_construct(**a) for a in result]
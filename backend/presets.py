@@ -62,6 +62,10 @@ PRESETS: list[Preset] = [
 ]
 
 
+# Name -> preset index built once at import for O(1) lookups
+_PRESET_BY_NAME: dict[str, Preset] = {p["name"]: p for p in PRESETS}
+
+
 def get_preset_names() -> list[str]:
     """Return list of preset names."""
     return [p["name"] for p in PRESETS]
@@ -69,7 +73,4 @@ def get_preset_names() -> list[str]:
 
 def get_preset(name: str) -> Preset | None:
     """Get a preset by name."""
-    for preset in PRESETS:
-        if preset["name"] == name:
-            return preset
-    return None
+    return _PRESET_BY_NAME.get(name)
@@ -1,11 +1,21 @@
 """Portfolio storage - save and load portfolios as JSON files."""
 
-import json
+import re
 from pathlib import Path
 from typing import Any
 
+import orjson
+
 DATA_DIR = Path("/app/data/portfolios")
 
+# Strips everything except word characters (alphanumerics + underscore),
+# spaces and hyphens from portfolio filenames in a single pass
+_UNSAFE_NAME_RE = re.compile(r"[^\w \-]")
+
+# Cached (directory mtime, names) for list_portfolios. Saves and deletes
+# bump the directory mtime, so invalidation is automatic.
+_list_cache: tuple[float, list[str]] | None = None
+
 
 def _ensure_data_dir() -> None:
     """Ensure the data directory exists."""
@@ -26,15 +36,15 @@ def save_portfolio(name: str, data: dict[str, Any]) -> Path:
     _ensure_data_dir()
     
     # Sanitize filename
-    safe_name = "".join(c for c in name if c.isalnum() or c in " -_").strip()
+    safe_name = _UNSAFE_NAME_RE.sub("", name).strip()
     if not safe_name:
         safe_name = "portfolio"
     
     filepath = DATA_DIR / f"{safe_name}.json"
     
-    with open(filepath, "w") as f:
-        json.dump(data, f, indent=2, default=str)
-    
+    with open(filepath, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2, default=str))
+
     return filepath
 
 
@@ -55,8 +65,8 @@ def load_portfolio(name: str) -> dict[str, Any] | None:
     if not filepath.exists():
         return None
     
-    with open(filepath, "r") as f:
-        return json.load(f)
+    with open(filepath, "rb") as f:
+        return orjson.loads(f.read())
 
 
 def list_portfolios() -> list[str]:
@@ -66,13 +76,16 @@ def list_portfolios() -> list[str]:
     Returns:
         List of portfolio names (filenames without extension)
     """
+    global _list_cache
     _ensure_data_dir()
-    
-    portfolios = []
-    for filepath in DATA_DIR.glob("*.json"):
-        portfolios.append(filepath.stem)
-    
-    return sorted(portfolios)
+
+    mtime = DATA_DIR.stat().st_mtime
+    if _list_cache is not None and _list_cache[0] == mtime:
+        return _list_cache[1]
+
+    portfolios = sorted(filepath.stem for filepath in DATA_DIR.glob("*.json"))
+    _list_cache = (mtime, portfolios)
+    return portfolios
 
 
 def delete_portfolio(name: str) -> bool: